@@ -6,8 +6,11 @@ import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
+import time
 import requests
+import urllib.parse
 from fastf1.ergast import Ergast
 
 # Page Config
@@ -88,106 +91,187 @@ fastf1.Cache.enable_cache(CACHE_DIR)
 
 # --- Helper Functions ---
 
+def read_parquet_cache(name, max_age, columns=None):
+    # Return a frame persisted under CACHE_DIR if it is younger than max_age seconds, else None
+    path = os.path.join(CACHE_DIR, name)
+    try:
+        if time.time() - os.path.getmtime(path) < max_age:
+            return pd.read_parquet(path, columns=columns)
+    except Exception:
+        pass
+    return None
+
+def write_parquet_cache(df, name):
+    # Best effort: a failed write only costs a refetch on the next cold start
+    try:
+        df.to_parquet(os.path.join(CACHE_DIR, name), compression='zstd')
+    except Exception:
+        pass
+
+ERGAST_PAGE_LIMIT = 100
+ERGAST_MAX_OFFSET = 10000 # Safety cap for teams with many entries
+ERGAST_FETCH_WORKERS = 4 # Jolpica rate-limits bursts, so keep the fan-out small
+ERGAST_RETRIES = 3 # Extra attempts for a page answered with 429 or 5xx
+ERGAST_RETRY_BACKOFF = 1.0 # seconds, doubled after each failed attempt
+
+@st.cache_resource
+def get_http_session():
+    # One keep-alive pool for all Jolpica calls, so paged fetches skip the TCP/TLS handshake per page
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=ERGAST_FETCH_WORKERS)
+    session.mount('https://', adapter)
+    return session
+
+def fetch_ergast_pages(base_url, limit=ERGAST_PAGE_LIMIT):
+    # First page tells us MRData.total; the remaining offsets are then requested concurrently.
+    # Returns the decoded pages in offset order. Raises if any page still fails after retrying, so
+    # callers never total up (or cache) a history with holes in it.
+    http = get_http_session()
+    def get_page(offset):
+        url = f"{base_url}?limit={limit}&offset={offset}"
+        for attempt in range(ERGAST_RETRIES + 1):
+            r = http.get(url, timeout=10)
+            if r.status_code == 200:
+                return r.json()
+            # Rate limiting and server errors are transient; anything else won't fix itself
+            if r.status_code != 429 and r.status_code < 500:
+                break
+            if attempt < ERGAST_RETRIES:
+                time.sleep(ERGAST_RETRY_BACKOFF * 2 ** attempt)
+        raise requests.HTTPError(f"{url} returned {r.status_code}", response=r)
+
+    first = get_page(0)
+    total = int(first.get('MRData', {}).get('total', 0))
+    offsets = range(limit, min(total, ERGAST_MAX_OFFSET + 1), limit)
+    with ThreadPoolExecutor(max_workers=ERGAST_FETCH_WORKERS) as executor:
+        rest = list(executor.map(get_page, offsets))
+    return [first] + rest
+
+ERGAST_RESULT_COLS = ['season', 'round', 'raceName', 'date', 'position', 'positionText', 'points',
+                      'grid', 'laps', 'status', 'driverId', 'constructorId']
+ERGAST_RESULT_DTYPES = {'season': 'int32', 'round': 'int16', 'position': 'int16', 'points': 'float32',
+                        'grid': 'int8', 'laps': 'int16'}
+
 @st.cache_data
 def fetch_ergast_results(entity_type, entity_id):
     # entity_type: 'drivers' or 'constructors'
     # Use Jolpica mirror as Ergast is deprecated/unreliable
     base_url = f"https://api.jolpi.ca/ergast/f1/{entity_type}/{entity_id}/results.json"
+    # Fetch and parse errors propagate so st.cache_data doesn't keep a partial (or empty) history;
+    # the caller reports them
+    frames = []
+    for data in fetch_ergast_pages(base_url):
+        races = [race for race in data.get('MRData', {}).get('RaceTable', {}).get('Races', []) if race.get('Results')]
+        if not races:
+            continue
+        
+        # One row per result, with the race fields repeated alongside
+        page_df = pd.json_normalize(races, record_path='Results', meta=['season', 'round', 'raceName', 'date'])
+        page_df = page_df.rename(columns={'Driver.driverId': 'driverId', 'Constructor.constructorId': 'constructorId'})
+        # Same columns and dtypes on every page so the concat never falls back to object
+        frames.append(page_df[ERGAST_RESULT_COLS].astype(ERGAST_RESULT_DTYPES))
     
-    all_results = []
-    limit = 100
-    offset = 0
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+QUAL_CACHE_TTL = 86400 # seconds
+QUAL_COLS = ['season', 'round', 'position']
+
+@st.cache_data
+def fetch_qualifying_results(driver_id):
+    cache_name = f"qual_{driver_id}.parquet"
+    cached = read_parquet_cache(cache_name, QUAL_CACHE_TTL)
+    if cached is not None:
+        return cached
     
-    try:
-        while True:
-            url = f"{base_url}?limit={limit}&offset={offset}"
-            r = requests.get(url, timeout=10)
-            if r.status_code != 200:
-                break
-            
-            data = r.json()
-            races = data.get('MRData', {}).get('RaceTable', {}).get('Races', [])
-            
-            if not races:
-                break
-                
-            # Count total results in this batch
-            batch_results_count = 0
-            for race in races:
-                base_info = {
-                    'season': int(race['season']),
-                    'round': int(race['round']),
-                    'raceName': race['raceName'],
-                    'date': race['date']
-                }
-                
-                race_results = race.get('Results', [])
-                batch_results_count += len(race_results)
-                
-                for result in race_results:
-                    row = base_info.copy()
-                    row.update({
-                        'position': int(result['position']),
-                        'positionText': result['positionText'],
-                        'points': float(result['points']),
-                        'grid': int(result['grid']),
-                        'laps': int(result['laps']),
-                        'status': result['status'],
-                        'driverId': result['Driver']['driverId'],
-                        'constructorId': result['Constructor']['constructorId']
-                    })
-                    all_results.append(row)
-            
-            # Check if we are done based on results count
-            if batch_results_count < limit:
-                break
-                
-            offset += limit # Increment by limit as we requested 'limit' results
-            if offset > 10000: # Increased safety break for teams with many entries
-                break
-        
-        return pd.DataFrame(all_results)
-    except Exception as e:
-        st.error(f"API Error: {e}")
-        return pd.DataFrame()
+    base_url = f"https://api.jolpi.ca/ergast/f1/drivers/{driver_id}/qualifying.json"
+    # Raises if any page is missing, so only a complete history reaches the parquet file and the
+    # cache; the caller reports the error
+    pages = fetch_ergast_pages(base_url)
+    frames = []
+    for data in pages:
+        races = [race for race in data.get('MRData', {}).get('RaceTable', {}).get('Races', []) if race.get('QualifyingResults')]
+        if not races:
+            continue
+        page_df = pd.json_normalize(races, record_path='QualifyingResults', meta=['season', 'round'])
+        frames.append(page_df[QUAL_COLS].astype({'season': 'int32', 'round': 'int16', 'position': 'int16'}))
+    
+    qual_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if not qual_df.empty:
+        write_parquet_cache(qual_df, cache_name)
+    return qual_df
+
+LOOKUP_CACHE_TTL = 7 * 86400 # seconds
+LOOKUP_DRIVER_COLS = ['driverId', 'givenName', 'familyName', 'driverNationality']
+LOOKUP_CONSTRUCTOR_COLS = ['constructorId', 'constructorName', 'constructorNationality']
 
 @st.cache_data
 def get_lookup_tables_v2():
-    try:
-        ergast = Ergast()
-        # Fetch all drivers
-        all_drivers = []
-        limit = 100
-        offset = 0
-        while True:
-            try:
-                resp = ergast.get_driver_info(limit=limit, offset=offset)
-                chunk = resp if isinstance(resp, pd.DataFrame) else (pd.concat(resp.content) if hasattr(resp, 'content') and resp.content else pd.DataFrame())
-                if chunk.empty: break
-                all_drivers.append(chunk)
-                if len(chunk) < limit: break
-                offset += limit
-            except Exception: break
-        d_df = pd.concat(all_drivers).drop_duplicates(subset=['driverId']) if all_drivers else pd.DataFrame()
-
-        # Fetch all constructors
-        all_constructors = []
-        offset = 0
-        while True:
-            try:
-                resp = ergast.get_constructor_info(limit=limit, offset=offset)
-                chunk = resp if isinstance(resp, pd.DataFrame) else (pd.concat(resp.content) if hasattr(resp, 'content') and resp.content else pd.DataFrame())
-                if chunk.empty: break
-                all_constructors.append(chunk)
-                if len(chunk) < limit: break
-                offset += limit
-            except Exception: break
-        c_df = pd.concat(all_constructors).drop_duplicates(subset=['constructorId']) if all_constructors else pd.DataFrame()
-        
-        return d_df, c_df
-    except Exception as e:
-        st.error(f"Error fetching lookup tables: {e}")
-        return pd.DataFrame(), pd.DataFrame()
+    # The all-time driver/constructor lists barely change, so a parquet copy under CACHE_DIR
+    # saves paginating Ergast on every cold start
+    d_df = read_parquet_cache('lookup_drivers.parquet', LOOKUP_CACHE_TTL, columns=LOOKUP_DRIVER_COLS)
+    c_df = read_parquet_cache('lookup_constructors.parquet', LOOKUP_CACHE_TTL, columns=LOOKUP_CONSTRUCTOR_COLS)
+
+    if d_df is None or c_df is None:
+        try:
+            ergast = Ergast()
+            # Fetch all drivers
+            all_drivers = []
+            # Only a list paged through to its end is written to disk; one cut short by an error is
+            # still shown, but refetched next time instead of being served for LOOKUP_CACHE_TTL
+            drivers_complete = False
+            limit = 100
+            offset = 0
+            while True:
+                try:
+                    resp = ergast.get_driver_info(limit=limit, offset=offset)
+                    chunk = resp if isinstance(resp, pd.DataFrame) else (pd.concat(resp.content) if hasattr(resp, 'content') and resp.content else pd.DataFrame())
+                    if chunk.empty:
+                        drivers_complete = True
+                        break
+                    all_drivers.append(chunk)
+                    if len(chunk) < limit:
+                        drivers_complete = True
+                        break
+                    offset += limit
+                except Exception: break
+            d_df = pd.concat(all_drivers).drop_duplicates(subset=['driverId'])[LOOKUP_DRIVER_COLS] if all_drivers else pd.DataFrame()
+
+            # Fetch all constructors
+            all_constructors = []
+            constructors_complete = False
+            offset = 0
+            while True:
+                try:
+                    resp = ergast.get_constructor_info(limit=limit, offset=offset)
+                    chunk = resp if isinstance(resp, pd.DataFrame) else (pd.concat(resp.content) if hasattr(resp, 'content') and resp.content else pd.DataFrame())
+                    if chunk.empty:
+                        constructors_complete = True
+                        break
+                    all_constructors.append(chunk)
+                    if len(chunk) < limit:
+                        constructors_complete = True
+                        break
+                    offset += limit
+                except Exception: break
+            c_df = pd.concat(all_constructors).drop_duplicates(subset=['constructorId'])[LOOKUP_CONSTRUCTOR_COLS] if all_constructors else pd.DataFrame()
+
+            if drivers_complete and constructors_complete and not d_df.empty and not c_df.empty:
+                write_parquet_cache(d_df, 'lookup_drivers.parquet')
+                write_parquet_cache(c_df, 'lookup_constructors.parquet')
+        except Exception as e:
+            st.error(f"Error fetching lookup tables: {e}")
+            return pd.DataFrame(), pd.DataFrame()
+    
+    # Lowercased search text, built once here so the search box can filter with vectorized string ops.
+    # Arrow-backed strings let str.contains run on Arrow's compute kernels instead of Python objects.
+    if not d_df.empty:
+        d_df = d_df.astype({'givenName': 'string[pyarrow]', 'familyName': 'string[pyarrow]', 'driverId': 'string[pyarrow]'})
+        d_df = d_df.assign(_search=d_df['givenName'].str.lower() + ' ' + d_df['familyName'].str.lower() + ' ' +
+                                   d_df['driverId'].str.lower())
+    if not c_df.empty:
+        c_df = c_df.astype({'constructorName': 'string[pyarrow]', 'constructorId': 'string[pyarrow]'})
+    
+    return d_df, c_df
 
 @st.cache_data
 def fetch_season_standings(year):
@@ -316,6 +400,31 @@ def render_header_stats(year):
         except Exception:
             pass
 
+# No blank lines inside: markdown would end the HTML block there
+RACE_CARD_TEMPLATE = """<a href="?load_event={safe_event}&load_year={year}" class="race-card-link" target="_self">
+    <div class="race-card">
+        <div>
+            <div class="race-round">ROUND {round}</div>
+            <div class="race-date">
+                <span>🗓️ {date_str}</span>
+                <span style="font-size: 0.85em; color: #ccc; margin-left: 10px; font-weight: normal;">⏰ {time_str}</span>
+            </div>
+            <div class="race-name">{event}</div>
+        </div>
+        <div class="race-loc">📍 {location}, {country}</div>
+    </div>
+</a>"""
+
+def format_ist(ts):
+    # (date, time) strings in IST for a race start; naive timestamps are taken as UTC
+    try:
+        if ts.tzinfo is None:
+            ts = ts.tz_localize('UTC')
+        ts_ist = ts.tz_convert('Asia/Kolkata')
+        return ts_ist.strftime('%d %b %Y'), ts_ist.strftime('%I:%M %p IST')
+    except Exception:
+        return str(ts), ""
+
 def render_championship_view(year, schedule):
     st.markdown(f"## {year} Championship Overview")
     
@@ -391,44 +500,27 @@ def render_championship_view(year, schedule):
         </style>
         """, unsafe_allow_html=True)
 
-        for i, (idx, row) in enumerate(events_to_show.iterrows()):
-            col = cols[i % 3]
+        # One markdown call per column instead of one per race
+        records = events_to_show.to_dict('records')
+        for c, col in enumerate(cols):
+            cards = []
+            for row in records[c::3]:
+                date_str, time_str = format_ist(row['Session5Date'])
+                cards.append(RACE_CARD_TEMPLATE.format(
+                    safe_event=urllib.parse.quote(row['EventName']), year=year, round=row['RoundNumber'],
+                    date_str=date_str, time_str=time_str, event=row['EventName'],
+                    location=row['Location'], country=row['Country']))
             with col:
-                try:
-                    # Convert to IST
-                    ts = row['Session5Date']
-                    if ts.tzinfo is None:
-                        ts = ts.tz_localize('UTC')
-                    
-                    ts_ist = ts.tz_convert('Asia/Kolkata')
-                    date_str = ts_ist.strftime('%d %b %Y')
-                    time_str = ts_ist.strftime('%I:%M %p IST')
-                except Exception as e:
-                    date_str = str(row['Session5Date'])
-                    time_str = ""
-                
-                # URL Encode event name
-                import urllib.parse
-                safe_event = urllib.parse.quote(row['EventName'])
-                
-                st.markdown(f"""
-                <a href="?load_event={safe_event}&load_year={year}" class="race-card-link" target="_self">
-                    <div class="race-card">
-                        <div>
-                            <div class="race-round">ROUND {row['RoundNumber']}</div>
-                            <div class="race-date">
-                                <span>🗓️ {date_str}</span>
-                                <span style="font-size: 0.85em; color: #ccc; margin-left: 10px; font-weight: normal;">⏰ {time_str}</span>
-                            </div>
-                            <div class="race-name">{row['EventName']}</div>
-                        </div>
-                        <div class="race-loc">📍 {row['Location']}, {row['Country']}</div>
-                    </div>
-                </a>
-                """, unsafe_allow_html=True)
+                st.markdown('\n'.join(cards), unsafe_allow_html=True)
     
     st.info("Standings data coming soon...")
 
+def career_totals(res_df):
+    # One pass over the raw columns: (entries, wins, podiums, points)
+    pos = res_df['position'].to_numpy()
+    pts = res_df['points'].to_numpy()
+    return len(pos), int(np.count_nonzero(pos == 1)), int(np.count_nonzero(pos <= 3)), float(pts.sum())
+
 def render_search_ui(search_query):
     if not search_query:
         return
@@ -441,25 +533,13 @@ def render_search_ui(search_query):
         if drivers_df.empty:
             st.error("Drivers database is empty! Check API connection.")
         
+        # Filter Drivers: every query word must appear in the precomputed search text
         if not drivers_df.empty:
-            drivers_df['fullName'] = drivers_df['givenName'] + ' ' + drivers_df['familyName']
-        
-        # Filter Drivers
-        if not drivers_df.empty:
-            query_lower = search_query.lower()
-            matches = []
-            query_parts = query_lower.split()
-            
-            for idx, row in drivers_df.iterrows():
-                given = str(row['givenName']).lower()
-                family = str(row['familyName']).lower()
-                did = str(row['driverId']).lower()
-                full = str(row['fullName']).lower()
-                search_text = f"{given} {family} {did} {full}"
-                if all(part in search_text for part in query_parts):
-                    matches.append(row)
-            
-            d_matches = pd.DataFrame(matches) if matches else pd.DataFrame()
+            query_parts = search_query.lower().split()
+            mask = np.ones(len(drivers_df), dtype=bool)
+            for part in query_parts:
+                mask &= drivers_df['_search'].str.contains(part, regex=False, na=False).to_numpy(dtype=bool)
+            d_matches = drivers_df[mask]
         else:
             d_matches = pd.DataFrame()
             
@@ -479,19 +559,21 @@ def render_search_ui(search_query):
                 st.markdown("### 🏎️ Drivers Found")
                 for idx, row in d_matches.iterrows():
                     with st.expander(f"{row['givenName']} {row['familyName']} ({row['driverNationality']})"):
+                        # Career stats cost several API calls, so only fetch them for cards the user asks for
+                        open_key = f"career_open_{row['driverId']}"
+                        if not st.session_state.get(open_key):
+                            if st.button("Load career stats", key=f"load_{open_key}"):
+                                st.session_state[open_key] = True
+                                st.rerun()
+                            continue
                         with st.spinner(f"Fetching career stats for {row['givenName']}..."):
                             try:
                                 res_df = fetch_ergast_results('drivers', row['driverId'])
-                                ergast = Ergast()
-                                qual_resp = ergast.get_qualifying_results(driver=row['driverId'], limit=1000)
-                                qual_df = pd.concat(qual_resp.content) if qual_resp.content else pd.DataFrame()
+                                qual_df = fetch_qualifying_results(row['driverId'])
                                 
                                 if not res_df.empty:
-                                    total_races = len(res_df)
-                                    wins = len(res_df[res_df['position'] == 1])
-                                    podiums = len(res_df[res_df['position'].isin([1, 2, 3])])
-                                    total_points = res_df['points'].sum()
-                                    poles = len(qual_df[qual_df['position'] == 1]) if not qual_df.empty else 0
+                                    total_races, wins, podiums, total_points = career_totals(res_df)
+                                    poles = int(np.count_nonzero(qual_df['position'].to_numpy() == 1)) if not qual_df.empty else 0
                                     
                                     col1, col2, col3, col4 = st.columns(4)
                                     col1.metric("Total Races", total_races)
@@ -501,9 +583,9 @@ def render_search_ui(search_query):
                                     st.metric("Career Points", f"{total_points:g}")
                                     
                                     st.caption("Recent Race Results")
-                                    if 'season' in res_df.columns and 'round' in res_df.columns:
-                                        res_df = res_df.sort_values(by=['season', 'round'], ascending=False)
-                                    st.dataframe(res_df[['season', 'round', 'raceName', 'position', 'points', 'status']].head(10), use_container_width=True)
+                                    # Partial sort: only the 10 latest rows are needed
+                                    recent = res_df.nlargest(10, ['season', 'round']) if {'season', 'round'}.issubset(res_df.columns) else res_df.head(10)
+                                    st.dataframe(recent[['season', 'round', 'raceName', 'position', 'points', 'status']], use_container_width=True)
                                 else:
                                     st.info("No race results found.")
                             except Exception as e:
@@ -513,24 +595,27 @@ def render_search_ui(search_query):
                 st.markdown("### 🛠️ Teams Found")
                 for idx, row in c_matches.iterrows():
                     with st.expander(f"{row['constructorName']} ({row['constructorNationality']})"):
+                        open_key = f"team_open_{row['constructorId']}"
+                        if not st.session_state.get(open_key):
+                            if st.button("Load team history", key=f"load_{open_key}"):
+                                st.session_state[open_key] = True
+                                st.rerun()
+                            continue
                         with st.spinner(f"Fetching history for {row['constructorName']}..."):
                             try:
                                 res_df = fetch_ergast_results('constructors', row['constructorId'])
                                 
                                 if not res_df.empty:
-                                    total_entries = len(res_df)
-                                    wins = len(res_df[res_df['position'] == 1])
-                                    podiums = len(res_df[res_df['position'].isin([1, 2, 3])])
-                                    total_points = res_df['points'].sum()
+                                    total_entries, wins, podiums, total_points = career_totals(res_df)
                                     col1, col2, col3 = st.columns(3)
                                     col1.metric("Race Entries", total_entries)
                                     col2.metric("Wins 🏆", wins)
                                     col3.metric("Podiums 🍾", podiums)
                                     st.metric("Total Points", f"{total_points:g}")
                                     st.caption("Recent Results")
-                                    if 'season' in res_df.columns and 'round' in res_df.columns:
-                                        res_df = res_df.sort_values(by=['season', 'round'], ascending=False)
-                                    st.dataframe(res_df[['season', 'round', 'raceName', 'driverId', 'position', 'points']].head(10), use_container_width=True)
+                                    # Partial sort: only the 10 latest rows are needed
+                                    recent = res_df.nlargest(10, ['season', 'round']) if {'season', 'round'}.issubset(res_df.columns) else res_df.head(10)
+                                    st.dataframe(recent[['season', 'round', 'raceName', 'driverId', 'position', 'points']], use_container_width=True)
                                 else:
                                     st.info("No results found.")
                             except Exception as e:
@@ -550,6 +635,45 @@ def render_results_tab(session):
     else:
         st.info("No results available for this session yet.")
 
+def session_cache_key(session):
+    # Stable identity for a loaded session. Cached helpers take the session itself as an unhashed
+    # _session argument, so this key is the only thing telling their entries apart: it must
+    # change whenever the session does, and must not depend on the object (id() changes on reload).
+    return (session.event['EventName'], session.name, str(session.date))
+
+TELEMETRY_TRACE_COLS = ['SessionTime', 'Distance', 'Speed', 'Throttle', 'Brake', 'RPM', 'nGear', 'DRS']
+TELEMETRY_TRACE_DTYPES = {'Distance': 'float32', 'Speed': 'float32', 'Throttle': 'float32', 'RPM': 'float32',
+                          'nGear': 'int8', 'DRS': 'int8', 'Brake': 'int8'}
+TELEMETRY_CACHE_ENTRIES = 40 # About two sessions' worth of drivers
+
+@st.cache_resource(show_spinner=False, max_entries=TELEMETRY_CACHE_ENTRIES)
+def get_fastest_lap_telemetry(_session, session_key, abbr):
+    # get_telemetry() re-merges and resamples car/position data on every call, so keep the result
+    # across reruns. Returns (sector 1/2 session times, plain frame of the plotted channels): FastF1's
+    # Lap and Telemetry keep a reference to the whole session, which would pin it in memory.
+    # Shared between reruns: callers must not modify the returned frame.
+    lap = _session.laps.pick_driver(abbr).pick_fastest()
+    if lap is None:
+        return None, None
+    tel = lap.get_telemetry()
+    # Narrow dtypes so each trace ships half the data to the browser
+    tel = pd.DataFrame({col: tel[col].to_numpy() for col in TELEMETRY_TRACE_COLS}).astype(TELEMETRY_TRACE_DTYPES, errors='ignore')
+    return (lap['Sector1SessionTime'], lap['Sector2SessionTime']), tel
+
+def driver_colors(session, default=None):
+    # Driver abbreviation -> team colour, resolving each team once
+    team_colors = {}
+    abbr_to_color = {}
+    for abbr, team_name in zip(session.results['Abbreviation'], session.results['TeamName']):
+        if team_name not in team_colors:
+            try:
+                team_colors[team_name] = fastf1.plotting.get_team_color(team_name, session=session)
+            except Exception:
+                team_colors[team_name] = default
+        abbr_to_color[abbr] = team_colors[team_name]
+    return abbr_to_color
+
+@st.fragment
 def render_telemetry_tab(session):
     st.subheader("Driver Telemetry Analysis")
     driver_map = session.results.set_index('FullName')['Abbreviation'].to_dict()
@@ -557,23 +681,21 @@ def render_telemetry_tab(session):
     selected_drivers = st.multiselect("Select Drivers to Compare", drivers, default=drivers[:2] if len(drivers) >= 2 else drivers)
     
     if selected_drivers:
-        fig_speed = go.Figure()
-        fig_throttle = go.Figure()
-        fig_brake = go.Figure()
-        fig_rpm = go.Figure()
-        fig_gear = go.Figure()
-        fig_drs = go.Figure()
+        # Traces are gathered as plain dicts and each figure is built from its list in one go,
+        # rather than validating a graph object per add_trace call
+        channels = ('Speed', 'Throttle', 'Brake', 'RPM', 'nGear', 'DRS')
+        traces = {channel: [] for channel in channels}
+        
+        session_key = session_cache_key(session)
         
         # Calculate Sector Lines (based on first driver)
         sector_lines = []
         try:
             ref_driver = driver_map[selected_drivers[0]]
-            ref_lap = session.laps.pick_driver(ref_driver).pick_fastest()
-            if ref_lap is not None:
-                ref_tel = ref_lap.get_telemetry()
+            ref_sectors, ref_tel = get_fastest_lap_telemetry(session, session_key, ref_driver)
+            if ref_tel is not None:
                 # Get Sector Times
-                s1_time = ref_lap['Sector1SessionTime']
-                s2_time = ref_lap['Sector2SessionTime']
+                s1_time, s2_time = ref_sectors
                 
                 # Find corresponding distances
                 if not pd.isnull(s1_time):
@@ -585,59 +707,50 @@ def render_telemetry_tab(session):
         except:
             pass
 
+        abbr_to_color = driver_colors(session)
         for driver_name in selected_drivers:
             driver_abbr = driver_map[driver_name]
             try:
-                laps = session.laps.pick_driver(driver_abbr)
-                fastest_lap = laps.pick_fastest()
-                if fastest_lap is not None:
-                    tel = fastest_lap.get_telemetry()
-                    try:
-                        team_name = session.results.loc[session.results['Abbreviation'] == driver_abbr, 'TeamName'].iloc[0]
-                        color = fastf1.plotting.get_team_color(team_name, session=session)
-                    except:
-                        color = None
+                _, tel = get_fastest_lap_telemetry(session, session_key, driver_abbr)
+                if tel is not None:
+                    color = abbr_to_color.get(driver_abbr)
                     
-                    fig_speed.add_trace(go.Scatter(x=tel['Distance'], y=tel['Speed'], mode='lines', name=f'{driver_name}', line=dict(color=color)))
-                    fig_throttle.add_trace(go.Scatter(x=tel['Distance'], y=tel['Throttle'], mode='lines', name=f'{driver_name}', line=dict(color=color)))
-                    fig_brake.add_trace(go.Scatter(x=tel['Distance'], y=tel['Brake'], mode='lines', name=f'{driver_name}', line=dict(color=color)))
-                    fig_rpm.add_trace(go.Scatter(x=tel['Distance'], y=tel['RPM'], mode='lines', name=f'{driver_name}', line=dict(color=color)))
-                    fig_gear.add_trace(go.Scatter(x=tel['Distance'], y=tel['nGear'], mode='lines', name=f'{driver_name}', line=dict(color=color)))
-                    fig_drs.add_trace(go.Scatter(x=tel['Distance'], y=tel['DRS'], mode='lines', name=f'{driver_name}', line=dict(color=color)))
+                    dist = tel['Distance'].to_numpy()
+                    for channel in channels:
+                        traces[channel].append(dict(type='scattergl', x=dist, y=tel[channel].to_numpy(), mode='lines',
+                                                    name=f'{driver_name}', line=dict(color=color)))
             except Exception as e:
                 st.warning(f"Could not load telemetry for {driver_name}: {e}")
         
-        # Helper to add sector lines
-        def add_sector_lines(fig):
-            for dist, label in sector_lines:
-                fig.add_vline(x=dist, line_width=1, line_dash="dash", line_color="gray")
-                fig.add_annotation(x=dist, y=1, yref="paper", text=label, showarrow=False, font=dict(color="gray"))
+        # Sector lines as plain layout dicts shared by every figure, instead of an add_vline and
+        # add_annotation (each a validated layout update) per line per figure
+        sector_layout = dict(
+            shapes=[dict(type='line', x0=dist, x1=dist, xref='x', y0=0, y1=1, yref='paper',
+                         line=dict(width=1, dash='dash', color='gray')) for dist, label in sector_lines],
+            annotations=[dict(x=dist, y=1, yref='paper', text=label, showarrow=False, font=dict(color='gray'))
+                         for dist, label in sector_lines])
+        fig_speed, fig_throttle, fig_brake, fig_rpm, fig_gear, fig_drs = (
+            go.Figure(data=traces[channel], layout=sector_layout) for channel in channels)
 
-        add_sector_lines(fig_speed)
         fig_speed.update_layout(title="Speed Trace", xaxis_title="Distance (m)", yaxis_title="Speed (km/h)")
         st.plotly_chart(fig_speed, use_container_width=True)
         
         col1, col2 = st.columns(2)
         with col1:
-            add_sector_lines(fig_throttle)
             fig_throttle.update_layout(title="Throttle Trace", xaxis_title="Distance (m)", yaxis_title="Throttle %")
             st.plotly_chart(fig_throttle, use_container_width=True)
         with col2:
-            add_sector_lines(fig_brake)
             fig_brake.update_layout(title="Brake Trace", xaxis_title="Distance (m)", yaxis_title="Brake")
             st.plotly_chart(fig_brake, use_container_width=True)
             
         col3, col4 = st.columns(2)
         with col3:
-            add_sector_lines(fig_rpm)
             fig_rpm.update_layout(title="RPM Trace", xaxis_title="Distance (m)", yaxis_title="RPM")
             st.plotly_chart(fig_rpm, use_container_width=True)
         with col4:
-            add_sector_lines(fig_gear)
             fig_gear.update_layout(title="Gear Trace", xaxis_title="Distance (m)", yaxis_title="Gear")
             st.plotly_chart(fig_gear, use_container_width=True)
             
-        add_sector_lines(fig_drs)
         fig_drs.update_layout(title="DRS Trace", xaxis_title="Distance (m)", yaxis_title="DRS Status")
         st.plotly_chart(fig_drs, use_container_width=True)
 
@@ -658,62 +771,67 @@ def render_lap_comparison_tab(session):
         fig_scatter = px.scatter(valid_laps, x="LapNumber", y="LapTimeSeconds", color="DriverName", title="Lap Times per Lap")
         st.plotly_chart(fig_scatter, use_container_width=True)
         
-        # 3. Head-to-Head Table
-        st.markdown("### ⚔️ Head-to-Head Analysis")
-        drivers = list(driver_map_reverse.values())
-        d_abbr_map = {v: k for k, v in driver_map_reverse.items()}
+        # 3. Head-to-Head Table (its own fragment: picking drivers redraws only this section)
+        render_head_to_head(valid_laps, driver_map_reverse)
+
+@st.fragment
+def render_head_to_head(valid_laps, driver_map_reverse):
+    st.markdown("### ⚔️ Head-to-Head Analysis")
+    drivers = list(driver_map_reverse.values())
+    d_abbr_map = {v: k for k, v in driver_map_reverse.items()}
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        d1_name = st.selectbox("Driver 1", drivers, index=0)
+    with col2:
+        d2_name = st.selectbox("Driver 2", drivers, index=1 if len(drivers) > 1 else 0)
+        
+    if d1_name and d2_name and d1_name != d2_name:
+        d1_abbr = d_abbr_map[d1_name]
+        d2_abbr = d_abbr_map[d2_name]
         
-        col1, col2 = st.columns(2)
-        with col1:
-            d1_name = st.selectbox("Driver 1", drivers, index=0)
-        with col2:
-            d2_name = st.selectbox("Driver 2", drivers, index=1 if len(drivers) > 1 else 0)
+        laps_d1 = valid_laps[valid_laps['Driver'] == d1_abbr][['LapNumber', 'LapTimeSeconds']].set_index('LapNumber')
+        laps_d2 = valid_laps[valid_laps['Driver'] == d2_abbr][['LapNumber', 'LapTimeSeconds']].set_index('LapNumber')
+        
+        # Join
+        df_compare = laps_d1.join(laps_d2, lsuffix='_d1', rsuffix='_d2').dropna()
+        
+        if not df_compare.empty:
+            df_compare['Delta'] = df_compare['LapTimeSeconds_d1'] - df_compare['LapTimeSeconds_d2']
+            df_compare['Winner'] = df_compare['Delta'].apply(lambda x: d2_name if x > 0 else d1_name)
+            df_compare['Gap'] = df_compare['Delta'].abs().apply(lambda x: f"{x:.3f}s")
             
-        if d1_name and d2_name and d1_name != d2_name:
-            d1_abbr = d_abbr_map[d1_name]
-            d2_abbr = d_abbr_map[d2_name]
+            # Format for display
+            display_df = df_compare.reset_index()
+            display_df = display_df[['LapNumber', 'Winner', 'Gap', 'LapTimeSeconds_d1', 'LapTimeSeconds_d2']]
+            display_df.columns = ['Lap', 'Winner', 'Gap', f'{d1_name} Time', f'{d2_name} Time']
             
-            laps_d1 = valid_laps[valid_laps['Driver'] == d1_abbr][['LapNumber', 'LapTimeSeconds']].set_index('LapNumber')
-            laps_d2 = valid_laps[valid_laps['Driver'] == d2_abbr][['LapNumber', 'LapTimeSeconds']].set_index('LapNumber')
+            st.dataframe(display_df, use_container_width=True)
             
-            # Join
-            df_compare = laps_d1.join(laps_d2, lsuffix='_d1', rsuffix='_d2').dropna()
+            # Visualization of the Delta
+            fig_delta = px.bar(
+                df_compare.reset_index(), 
+                x='LapNumber', 
+                y='Delta', 
+                color='Winner',
+                title=f"Lap Time Delta: {d1_name} vs {d2_name}",
+                labels={'Delta': 'Time Delta (s)', 'LapNumber': 'Lap Number'},
+                color_discrete_map={d1_name: '#ff1801', d2_name: '#1f77b4'} # Example colors
+            )
+            # Add a reference line at 0
+            fig_delta.add_hline(y=0, line_width=1, line_color="white")
             
-            if not df_compare.empty:
-                df_compare['Delta'] = df_compare['LapTimeSeconds_d1'] - df_compare['LapTimeSeconds_d2']
-                df_compare['Winner'] = df_compare['Delta'].apply(lambda x: d2_name if x > 0 else d1_name)
-                df_compare['Gap'] = df_compare['Delta'].abs().apply(lambda x: f"{x:.3f}s")
-                
-                # Format for display
-                display_df = df_compare.reset_index()
-                display_df = display_df[['LapNumber', 'Winner', 'Gap', 'LapTimeSeconds_d1', 'LapTimeSeconds_d2']]
-                display_df.columns = ['Lap', 'Winner', 'Gap', f'{d1_name} Time', f'{d2_name} Time']
-                
-                st.dataframe(display_df, use_container_width=True)
-                
-                # Visualization of the Delta
-                fig_delta = px.bar(
-                    df_compare.reset_index(), 
-                    x='LapNumber', 
-                    y='Delta', 
-                    color='Winner',
-                    title=f"Lap Time Delta: {d1_name} vs {d2_name}",
-                    labels={'Delta': 'Time Delta (s)', 'LapNumber': 'Lap Number'},
-                    color_discrete_map={d1_name: '#ff1801', d2_name: '#1f77b4'} # Example colors
-                )
-                # Add a reference line at 0
-                fig_delta.add_hline(y=0, line_width=1, line_color="white")
-                
-                # Update layout for better readability
-                fig_delta.update_layout(
-                    yaxis_title=f"Gap (s) - < 0: {d1_name} Faster | > 0: {d2_name} Faster",
-                    legend_title="Lap Winner"
-                )
-                
-                st.plotly_chart(fig_delta, use_container_width=True)
-            else:
-                st.info("No overlapping clean laps found for comparison.")
+            # Update layout for better readability
+            fig_delta.update_layout(
+                yaxis_title=f"Gap (s) - < 0: {d1_name} Faster | > 0: {d2_name} Faster",
+                legend_title="Lap Winner"
+            )
+            
+            st.plotly_chart(fig_delta, use_container_width=True)
+        else:
+            st.info("No overlapping clean laps found for comparison.")
 
+@st.fragment
 def render_track_map_tab(session, selected_event_name):
     st.subheader("Track Map")
     try:
@@ -769,8 +887,250 @@ def render_track_map_tab(session, selected_event_name):
         st.warning(f"Could not generate track map: {e}")
 
 import json
+import base64
 import streamlit.components.v1 as components
 
+# Max parallel per-driver telemetry fetches when building a replay
+REPLAY_FETCH_WORKERS = 8
+# Rows shown on the replay leaderboard
+LEADERBOARD_SIZE = 15
+# Replay sample spacing in seconds. The canvas interpolates between samples on every animation
+# frame, so the grid only needs to be fine enough to keep corners and overtakes in shape.
+REPLAY_RACE_STEP = 1.0
+REPLAY_LAP_STEP = 0.25
+REPLAY_TEL_COLS = ['TimeSec', 'X', 'Y', 'Speed', 'Distance', 'nGear', 'DRS']
+# Wire types of the per-driver replay channels; the canvas script decodes them with the matching
+# typed arrays (Float32Array, Int16Array, Int8Array)
+REPLAY_CHANNEL_DTYPES = {'x': '<f4', 'y': '<f4', 'd': '<f4', 's': '<i2', 'g': 'i1', 'drs': 'i1'}
+# Position channels are needed for every car; speed/gear/DRS only feed the focus driver's telemetry box
+REPLAY_POSITION_CHANNELS = ['x', 'y', 'd']
+REPLAY_FOCUS_CHANNELS = ['s', 'g', 'drs']
+REPLAY_TEL_DTYPES = {'X': 'float32', 'Y': 'float32', 'Speed': 'float32', 'Distance': 'float32',
+                     'nGear': 'int8', 'DRS': 'int8'}
+# Per-driver telemetry entries kept in memory; about two sessions' worth of drivers
+REPLAY_TEL_CACHE_ENTRIES = 40
+
+def interpolate_channels(time_grid, t_orig, fp, left, right, idx=None):
+    # Linear interpolation of several channels (rows of fp) onto time_grid with a single
+    # searchsorted; left/right are per-channel fills outside t_orig (None = edge value, as np.interp).
+    # idx may pass in searchsorted(t_orig, time_grid, side='right') - 1 if the caller already has it.
+    if idx is None:
+        idx = np.searchsorted(t_orig, time_grid, side='right') - 1
+    if len(t_orig) < 2:
+        t_orig = np.repeat(t_orig, 2)
+        fp = np.repeat(fp, 2, axis=1)
+    idx = np.clip(idx, 0, len(t_orig) - 2)
+    t_lo = t_orig[idx]
+    span = t_orig[idx + 1] - t_lo
+    w_right = np.divide(time_grid - t_lo, span, out=np.zeros(len(time_grid)), where=span > 0)
+    w_right = np.clip(w_right, 0.0, 1.0)
+    out = fp[:, idx] * (1.0 - w_right) + fp[:, idx + 1] * w_right
+
+    before = time_grid < t_orig[0]
+    after = time_grid > t_orig[-1]
+    for c in range(len(fp)):
+        if left[c] is not None:
+            out[c, before] = left[c]
+        if right[c] is not None:
+            out[c, after] = right[c]
+    return out
+
+def encode_array(arr, dtype):
+    # Raw little-endian buffer as base64; the replay script views it with the matching typed array
+    return base64.b64encode(np.ascontiguousarray(arr, dtype=dtype).tobytes()).decode('ascii')
+
+def step_values(times, values, time_grid, default):
+    # Value in force at each grid time for a step series where values[i] applies from times[i]
+    # (times sorted); default before the first change or if there are none
+    if len(times) == 0:
+        return np.full(len(time_grid), default)
+    pos = np.searchsorted(times, time_grid, side='right') - 1
+    return np.where(pos >= 0, values[np.maximum(pos, 0)], default)
+
+def rank_frames(dist):
+    # Leaderboard order for every time step from a (drivers, time) distance matrix: a (time, drivers)
+    # array of driver indices, furthest first, with missing samples ranked last. Every driver is kept:
+    # the canvas drops those with no position at the drawn time before cutting to LEADERBOARD_SIZE.
+    order = np.argsort(-np.nan_to_num(dist, nan=-np.inf), axis=0, kind='stable')
+    return order.T.astype(np.int8)
+
+@st.cache_data(show_spinner=False, max_entries=REPLAY_TEL_CACHE_ENTRIES)
+def load_driver_telemetry(_session, session_key, abbr, selected_lap):
+    # One driver's replay channels as plain arrays, which pickle and hash far cheaper than a frame.
+    # The payload cache is keyed on the whole selection, so this is what lets adding or dropping a
+    # driver, or changing the focus, skip reloading everyone else's telemetry.
+    # TimeSec is session time for the full race and time since the lap start for a single lap.
+    # None if the driver has no such lap.
+    d_laps = _session.laps.pick_driver(abbr)
+    
+    if selected_lap == "Full Race":
+        if d_laps.empty: return None
+        tel = d_laps.get_telemetry()
+        start_time = 0.0
+    else:
+        lap_data = d_laps[d_laps['LapNumber'] == selected_lap]
+        if lap_data.empty: return None
+        
+        if 'LapStartTime' in lap_data.columns:
+            start_time = lap_data['LapStartTime'].iloc[0].total_seconds()
+        else:
+            start_time = lap_data['Time'].iloc[0].total_seconds() - lap_data['LapTime'].iloc[0].total_seconds()
+        tel = lap_data.iloc[0].get_telemetry()
+    
+    tel = tel.assign(TimeSec=tel['SessionTime'].dt.total_seconds() - start_time)
+    # Narrow dtypes halve the memory walked by the replay gathers; TimeSec stays float64 so it
+    # bisects exactly against the float64 grid
+    tel = tel[REPLAY_TEL_COLS].dropna().astype(REPLAY_TEL_DTYPES)
+    return {col: tel[col].to_numpy() for col in REPLAY_TEL_COLS}
+
+@st.cache_data(show_spinner=False, persist='disk')
+def build_replay_payload(_session, session_key, selected_lap, abbrs, focus_abbr):
+    # Everything the canvas needs, as a JSON string. It only depends on the selection, so reruns
+    # (and restarts, via persist='disk') reuse it. session_key identifies _session, which
+    # Streamlit does not hash. Returns None if the focus driver has no such lap.
+    session = _session
+
+    # 1. Track Map Data (runs on the worker pool next to the driver fetches below)
+    def build_track():
+        ref_lap = session.laps.pick_fastest()
+        if ref_lap is None: ref_lap = session.laps.iloc[0]
+        ref_tel = ref_lap.get_telemetry()
+        
+        # Track outline as two coordinate arrays rather than one {x, y} object per sample
+        track_x = ref_tel['X'].to_numpy(dtype=float)
+        track_y = ref_tel['Y'].to_numpy(dtype=float)
+        # Bounds ride along with the cached payload, so the canvas doesn't rescan the outline on load
+        return {'x': track_x.tolist(), 'y': track_y.tolist(),
+                'bounds': [float(track_x.min()), float(track_x.max()), float(track_y.min()), float(track_y.max())]}
+    
+    # 2. Track Status Data (session time of each change, status code)
+    status_times = np.array([])
+    status_codes = np.array([], dtype=np.int8)
+    try:
+        ts = session.track_status
+        if ts is not None and not ts.empty:
+            status_times = ts['Time'].dt.total_seconds().to_numpy()
+            status_codes = pd.to_numeric(ts['Status'], errors='coerce').fillna(1).to_numpy(dtype=np.int8)
+    except Exception:
+        pass
+
+    # 3. Time Grid & Lap Data
+    if selected_lap == "Full Race":
+        start_t = session.laps['LapStartTime'].min().total_seconds()
+        end_t = session.laps['Time'].max().total_seconds()
+        duration = end_t - start_t
+        time_grid = np.arange(start_t, end_t, REPLAY_RACE_STEP)
+        grid_offset = 0.0 # grid is already in session time
+        
+        # Lap counter follows the focus driver: lap number in force at every grid step
+        try:
+            f_laps = session.laps.pick_driver(focus_abbr)
+            # Handle potential NaT
+            lap_starts = f_laps['LapStartTime'].fillna(f_laps['Time'] - f_laps['LapTime']).dt.total_seconds().to_numpy()
+            valid = ~np.isnan(lap_starts)
+            grid_lap = step_values(lap_starts[valid], f_laps['LapNumber'].to_numpy()[valid], time_grid, 1)
+        except:
+            grid_lap = np.zeros(len(time_grid)) # 0 = unknown, counter left as is
+            
+    else:
+        f_laps = session.laps.pick_driver(focus_abbr)
+        specific_lap = f_laps[f_laps['LapNumber'] == selected_lap]
+        if specific_lap.empty:
+            return None
+        
+        lap_duration = specific_lap['LapTime'].iloc[0].total_seconds()
+        time_grid = np.arange(0, lap_duration + 2.0, REPLAY_LAP_STEP)
+        grid_lap = np.full(len(time_grid), selected_lap) # Static for single lap
+        # Grid is relative to the focus driver's lap start; this maps it back to session time
+        lap_row = specific_lap.iloc[0]
+        if pd.notnull(lap_row['LapStartTime']):
+            grid_offset = lap_row['LapStartTime'].total_seconds()
+        else:
+            grid_offset = lap_row['Time'].total_seconds() - lap_duration
+
+    # Status in force at every grid step (green before the first message), so the canvas does a
+    # plain index instead of scanning the status list each frame
+    grid_status = step_values(status_times, status_codes, time_grid + grid_offset, 1)
+
+    # 4. Interpolate Data
+    abbr_to_color = driver_colors(session, default='#ffffff')
+
+    def fetch_one(abbr):
+        # Fetch + interpolate one driver; runs on a worker thread so no Streamlit calls here.
+        # None only when the driver has no such lap (or no samples in it). Errors propagate, so a
+        # replay missing cars through a failed load is never cached or persisted.
+        tel = load_driver_telemetry(session, session_key, abbr, selected_lap)
+        if tel is None: return None
+        
+        # Only samples around a single lap's window take part in the interpolation. The full
+        # race keeps every sample, so steps at the grid edges still interpolate across gaps.
+        if selected_lap != "Full Race":
+            keep = (tel['TimeSec'] >= time_grid[0] - 1) & (tel['TimeSec'] <= time_grid[-1] + 1)
+            tel = {col: values[keep] for col, values in tel.items()}
+        t_orig = tel['TimeSec']
+        if len(t_orig) == 0: return None
+        
+        # One bisect serves both the linear channels and the step (last-sample) channels
+        idx = np.searchsorted(t_orig, time_grid, side='right') - 1
+        fp = np.stack([tel['X'], tel['Y'], tel['Distance'], tel['Speed']])
+        x_new, y_new, dist_new, speed_new = interpolate_channels(
+            time_grid, t_orig, fp, left=(None, None, 0, 0), right=(None, None, None, 0), idx=idx)
+        
+        # Step channels (both int8) share one gather
+        step_idx = np.clip(idx, 0, len(t_orig)-1)
+        gear_new, drs_new = np.stack([tel['nGear'], tel['DRS']])[:, step_idx]
+        
+        color = abbr_to_color.get(abbr, '#ffffff')
+
+        # Column-oriented: one array per channel instead of one dict per time step.
+        # NaN position marks steps where the car has no position.
+        missing = np.isnan(x_new) | np.isnan(y_new)
+        x_new[missing] = y_new[missing] = dist_new[missing] = np.nan
+        return {'color': color, 'x': x_new, 'y': y_new, 'd': dist_new, 's': speed_new,
+                'g': gear_new, 'drs': drs_new}
+
+    # Drivers (and the reference-lap outline) are independent, so overlap their telemetry fetches
+    fetched = {}
+    with ThreadPoolExecutor(max_workers=REPLAY_FETCH_WORKERS) as executor:
+        track_future = executor.submit(build_track)
+        futures = {executor.submit(fetch_one, abbr): abbr for abbr in abbrs}
+        for fut in as_completed(futures):
+            fetched[futures[fut]] = fut.result()
+        track_data = track_future.result()
+
+    # Keep the selection order so the draw order is stable
+    drivers = [abbr for abbr in abbrs if fetched.get(abbr) is not None]
+    
+    # One (drivers, time) block per channel, so each channel is a single buffer on the wire
+    blocks = {k: np.stack([fetched[abbr][k] for abbr in drivers]) if drivers else np.zeros((0, len(time_grid)))
+              for k in REPLAY_POSITION_CHANNELS}
+    focus_data = fetched.get(focus_abbr)
+    
+    # Leaderboard order (indices into drivers) for every time step, ranked once here instead of
+    # sorted per drawn frame in the browser
+    order = rank_frames(blocks['d'])
+
+    payload = {
+        'track': track_data,
+        'track_status': encode_array(grid_status, 'i1'),
+        'drivers': drivers,
+        'colors': [fetched[abbr]['color'] for abbr in drivers],
+        # Per-step arrays go out as base64 typed-array buffers rather than JSON number lists
+        'channels': {k: encode_array(blocks[k], REPLAY_CHANNEL_DTYPES[k]) for k in REPLAY_POSITION_CHANNELS},
+        'focus_channels': {k: encode_array(focus_data[k], REPLAY_CHANNEL_DTYPES[k]) for k in REPLAY_FOCUS_CHANNELS}
+                          if focus_data is not None else None,
+        'order': encode_array(order, 'i1'),
+        'order_width': order.shape[1],
+        'time_steps': np.round(time_grid, 2).tolist(),
+        'lap_data': encode_array(grid_lap, 'i1'),
+        'focus_driver': focus_abbr,
+        'lap_number': selected_lap if selected_lap != "Full Race" else "Race"
+    }
+    
+    # Compact separators: the string is embedded verbatim in the replay page
+    return json.dumps(payload, separators=(',', ':'))
+
+@st.fragment
 def render_replay_tab(session):
     st.subheader("Race Replay (Canvas Engine)")
     
@@ -794,154 +1154,21 @@ def render_replay_tab(session):
         st.info("Please select drivers to generate the replay.")
         return
 
+    session_key = session_cache_key(session)
+    abbrs = tuple(driver_map[d_name] for d_name in replay_drivers)
+    focus_abbr = driver_map[focus_driver_name]
+    # The built page is kept in session_state, so reruns from other widgets keep showing the
+    # replay (without rebuilding it) until the selection changes
+    replay_key = (session_key, selected_lap, abbrs, focus_abbr)
+
     if st.button("Generate Replay", type="primary"):
-        status_text = st.empty()
-        progress_bar = st.progress(0)
-        
         try:
             with st.spinner("Processing telemetry data..."):
-                # 1. Track Map Data
-                status_text.text("Building track map...")
-                ref_lap = session.laps.pick_fastest()
-                if ref_lap is None: ref_lap = session.laps.iloc[0]
-                ref_tel = ref_lap.get_telemetry()
-                
-                # Simplify track data
-                track_data = [{'x': float(x), 'y': float(y)} for x, y in zip(ref_tel['X'], ref_tel['Y'])]
-                
-                # 2. Track Status Data
-                track_status_data = []
-                try:
-                    ts = session.track_status
-                    if ts is not None and not ts.empty:
-                        for _, row in ts.iterrows():
-                            track_status_data.append({
-                                't': row['Time'].total_seconds(),
-                                's': row['Status']
-                            })
-                except Exception:
-                    pass
-
-                # 3. Time Grid & Lap Data
-                lap_start_times = []
-                
-                if selected_lap == "Full Race":
-                    start_t = session.laps['LapStartTime'].min().total_seconds()
-                    end_t = session.laps['Time'].max().total_seconds()
-                    duration = end_t - start_t
-                    # Use 1.0s steps for Full Race to keep JSON size manageable while allowing smooth JS interpolation
-                    step = 1.0 
-                    time_grid = np.arange(start_t, end_t, step)
-                    
-                    # Get Lap Start Times for Focus Driver (or winner) for the Lap Counter
-                    try:
-                        f_abbr = driver_map[focus_driver_name]
-                        f_laps = session.laps.pick_driver(f_abbr)
-                        # Create list of {lap: N, time: T}
-                        for _, row in f_laps.iterrows():
-                            # Handle potential NaT
-                            if pd.notnull(row['LapStartTime']):
-                                t_start = row['LapStartTime'].total_seconds()
-                            else:
-                                t_start = row['Time'].total_seconds() - row['LapTime'].total_seconds()
-                            
-                            lap_start_times.append({'l': int(row['LapNumber']), 't': t_start})
-                    except:
-                        pass
-                        
-                else:
-                    f_abbr = driver_map[focus_driver_name]
-                    f_laps = session.laps.pick_driver(f_abbr)
-                    specific_lap = f_laps[f_laps['LapNumber'] == selected_lap]
-                    if specific_lap.empty:
-                        st.error(f"Driver {focus_driver_name} did not complete Lap {selected_lap}.")
-                        return
-                    
-                    lap_duration = specific_lap['LapTime'].iloc[0].total_seconds()
-                    step = 0.2 
-                    time_grid = np.arange(0, lap_duration + 2.0, step)
-                    lap_start_times = [{'l': int(selected_lap), 't': 0}] # Static for single lap
-
-                # 4. Interpolate Data
-                drivers_data = {}
-                total_drivers = len(replay_drivers)
-                
-                for i, d_name in enumerate(replay_drivers):
-                    status_text.text(f"Processing {d_name}...")
-                    progress_bar.progress((i + 1) / total_drivers)
-                    
-                    abbr = driver_map[d_name]
-                    try:
-                        d_laps = session.laps.pick_driver(abbr)
-                        
-                        if selected_lap == "Full Race":
-                            tel = d_laps.get_telemetry()
-                            tel['TimeSec'] = tel['SessionTime'].dt.total_seconds()
-                        else:
-                            lap_data = d_laps[d_laps['LapNumber'] == selected_lap]
-                            if lap_data.empty: continue
-                            
-                            if 'LapStartTime' in lap_data.columns:
-                                start_time = lap_data['LapStartTime'].iloc[0].total_seconds()
-                            else:
-                                start_time = lap_data['Time'].iloc[0].total_seconds() - lap_data['LapTime'].iloc[0].total_seconds()
-                            
-                            tel = lap_data.iloc[0].get_telemetry()
-                            tel['TimeSec'] = tel['Time'].dt.total_seconds() - start_time
-
-                        cols = ['TimeSec', 'X', 'Y', 'Speed', 'Distance', 'nGear', 'DRS']
-                        tel = tel[cols].dropna()
-                        t_orig = tel['TimeSec'].values
-                        
-                        x_new = np.interp(time_grid, t_orig, tel['X'].values, left=None, right=None)
-                        y_new = np.interp(time_grid, t_orig, tel['Y'].values, left=None, right=None)
-                        dist_new = np.interp(time_grid, t_orig, tel['Distance'].values, left=0, right=None)
-                        speed_new = np.interp(time_grid, t_orig, tel['Speed'].values, left=0, right=0)
-                        
-                        idx = np.searchsorted(t_orig, time_grid, side='right') - 1
-                        idx = np.clip(idx, 0, len(t_orig)-1)
-                        gear_new = tel['nGear'].values[idx]
-                        drs_new = tel['DRS'].values[idx]
-                        
-                        try:
-                            team_name = session.results.loc[session.results['Abbreviation'] == abbr, 'TeamName'].iloc[0]
-                            color = fastf1.plotting.get_team_color(team_name, session=session)
-                        except:
-                            color = '#ffffff'
-
-                        entries = []
-                        for j in range(len(time_grid)):
-                            if np.isnan(x_new[j]) or np.isnan(y_new[j]):
-                                entries.append(None)
-                            else:
-                                entries.append({
-                                    'x': round(float(x_new[j]), 1),
-                                    'y': round(float(y_new[j]), 1),
-                                    'd': round(float(dist_new[j]), 1),
-                                    's': int(speed_new[j]),
-                                    'g': int(gear_new[j]),
-                                    'drs': int(drs_new[j])
-                                })
-                        
-                        drivers_data[abbr] = {
-                            'color': color,
-                            'entries': entries
-                        }
-                        
-                    except Exception:
-                        continue
-                
-                payload = {
-                    'track': track_data,
-                    'track_status': track_status_data,
-                    'drivers': drivers_data,
-                    'time_steps': [round(float(t), 1) for t in time_grid],
-                    'lap_data': lap_start_times,
-                    'focus_driver': driver_map[focus_driver_name],
-                    'lap_number': selected_lap if selected_lap != "Full Race" else "Race"
-                }
-                
-                json_data = json.dumps(payload)
+                json_data = build_replay_payload(session, session_key, selected_lap, abbrs, focus_abbr)
+                if json_data is None:
+                    st.error(f"Driver {focus_driver_name} did not complete Lap {selected_lap}.")
+                    return
+                lap_label = selected_lap if selected_lap != "Full Race" else "Race"
                 
                 html_code = f"""
                 <!DOCTYPE html>
@@ -1001,7 +1228,7 @@ def render_replay_tab(session):
                         <canvas id="raceCanvas"></canvas>
                         <div id="ui-layer">
                             <div id="race-info">
-                                <h1><span id="lap-display">LAP {payload['lap_number']}</span> <span id="flag-status">GREEN</span></h1>
+                                <h1><span id="lap-display">LAP {lap_label}</span> <span id="flag-status">GREEN</span></h1>
                                 <p id="race-time">TIME: 00:00.0</p>
                             </div>
                             
@@ -1043,6 +1270,24 @@ def render_replay_tab(session):
 
                     <script>
                         const data = {json_data};
+                        
+                        // Per-step arrays arrive as base64 buffers (see REPLAY_CHANNEL_DTYPES); decode them once
+                        function decodeArray(b64, Type) {{
+                            const bin = atob(b64);
+                            const bytes = new Uint8Array(bin.length);
+                            for(let i=0; i<bin.length; i++) bytes[i] = bin.charCodeAt(i);
+                            return new Type(bytes.buffer);
+                        }}
+                        const channelTypes = {{ x: Float32Array, y: Float32Array, d: Float32Array, s: Int16Array, g: Int8Array, drs: Int8Array }};
+                        const channels = {{}};
+                        for(const k in data.channels) channels[k] = decodeArray(data.channels[k], channelTypes[k]);
+                        const focusTel = {{}};
+                        for(const k in data.focus_channels || {{}}) focusTel[k] = decodeArray(data.focus_channels[k], channelTypes[k]);
+                        const trackStatus = decodeArray(data.track_status, Int8Array);
+                        const lapByStep = decodeArray(data.lap_data, Int8Array);
+                        const orderWidth = data.order_width;
+                        const order = decodeArray(data.order, Int8Array);
+                        const leaderboardSize = Math.min(orderWidth, {LEADERBOARD_SIZE});
                         const canvas = document.getElementById('raceCanvas');
                         const ctx = canvas.getContext('2d');
                         
@@ -1056,6 +1301,19 @@ def render_replay_tab(session):
                         const startTime = data.time_steps[0];
                         const endTime = data.time_steps[data.time_steps.length - 1];
                         const totalDuration = endTime - startTime;
+                        const timeStep = data.time_steps[1] - data.time_steps[0];
+                        const numSteps = data.time_steps.length;
+                        // Per-driver arrays indexed like data.order, so drawing a frame allocates no lookup objects.
+                        // Each driver's channels are views into its row of the (driver, time) blocks.
+                        const driverAbbrs = data.drivers;
+                        const driverColors = data.colors;
+                        const drivers = driverAbbrs.map((abbr, k) => {{
+                            const drv = {{ color: driverColors[k] }};
+                            for(const c in channels) drv[c] = channels[c].subarray(k * numSteps, (k + 1) * numSteps);
+                            return drv;
+                        }});
+                        const focusIdx = driverAbbrs.indexOf(data.focus_driver);
+                        const curDist = new Float64Array(drivers.length); // NaN = no position this frame
                         
                         // Elements
                         const timeline = document.getElementById('timeline');
@@ -1065,6 +1323,16 @@ def render_replay_tab(session):
                         const lbContent = document.getElementById('lb-content');
                         const camBtn = document.getElementById('cam-toggle');
                         
+                        // Most readouts hold their value across many frames, and every DOM write costs a
+                        // style/layout pass, so only write text that changed. Returns true if it did.
+                        function setText(el, text) {{
+                            text = String(text);
+                            if(el.textContent === text) return false;
+                            el.textContent = text;
+                            return true;
+                        }}
+                        let shownStatus = null;
+                        
                         // Telemetry Elements
                         const tSpeed = document.getElementById('t-speed');
                         const tGear = document.getElementById('t-gear');
@@ -1101,16 +1369,28 @@ def render_replay_tab(session):
                             playbackSpeed = parseInt(val);
                         }}
                         
+                        // Dragging the timeline fires input events far faster than the screen refreshes;
+                        // fold them into at most one draw per animation frame (the play loop draws anyway)
+                        let drawPending = false;
+                        function requestDraw() {{
+                            if(isPlaying || drawPending) return;
+                            drawPending = true;
+                            requestAnimationFrame(() => {{
+                                drawPending = false;
+                                draw();
+                            }});
+                        }}
+                        
                         function seek(val) {{
                             currentRaceTime = startTime + parseFloat(val);
                             timeline.value = val;
-                            draw();
+                            requestDraw();
                         }}
                         
                         function toggleCamera() {{
                             followCam = !followCam;
                             camBtn.classList.toggle('active');
-                            draw();
+                            requestDraw();
                         }}
                         
                         function resize() {{
@@ -1120,17 +1400,22 @@ def render_replay_tab(session):
                         }}
                         window.addEventListener('resize', resize);
                         
-                        // Pre-calc track bounds
-                        let minX = Infinity, maxX = -Infinity, minY = Infinity, maxY = -Infinity;
-                        data.track.forEach(p => {{
-                            if(p.x < minX) minX = p.x;
-                            if(p.x > maxX) maxX = p.x;
-                            if(p.y < minY) minY = p.y;
-                            if(p.y > maxY) maxY = p.y;
-                        }});
+                        // Track bounds come precomputed with the payload
+                        const trackX = data.track.x, trackY = data.track.y;
+                        const [minX, maxX, minY, maxY] = data.track.bounds;
                         const trackWidth = maxX - minX;
                         const trackHeight = maxY - minY;
                         
+                        // The outline never changes, so build its path once and just stroke it each frame
+                        const trackPath = new Path2D();
+                        trackPath.moveTo(trackX[0], trackY[0]);
+                        for(let i=1; i<trackX.length; i++) trackPath.lineTo(trackX[i], trackY[i]);
+                        
+                        // Offscreen copy of the fitted track (see draw)
+                        const trackLayer = document.createElement('canvas');
+                        const trackCtx = trackLayer.getContext('2d');
+                        let trackLayerKey = '';
+                        
                         function loop(now) {{
                             if(!isPlaying) return;
                             
@@ -1148,66 +1433,58 @@ def render_replay_tab(session):
                             requestAnimationFrame(loop);
                         }}
                         
-                        function getTrackColor(t) {{
-                            let status = '1'; 
-                            if(data.track_status && data.track_status.length > 0) {{
-                                for(let i=0; i<data.track_status.length; i++) {{
-                                    if(data.track_status[i].t <= t) {{
-                                        status = data.track_status[i].s;
-                                    }} else {{
-                                        break;
-                                    }}
-                                }}
-                            }}
-                            
-                            if(status == '1') return {{c: '#666', label: 'GREEN', bg: '#00ff00', fg: 'black'}};
-                            if(status == '2') return {{c: '#ffd700', label: 'YELLOW', bg: '#ffd700', fg: 'black'}};
-                            if(status == '3') return {{c: '#ffa500', label: 'SC', bg: '#ffa500', fg: 'black'}};
-                            if(status == '4') return {{c: '#ff0000', label: 'RED', bg: '#ff0000', fg: 'white'}};
-                            if(status == '5' || status == '6' || status == '7') return {{c: '#ff8c00', label: 'VSC', bg: '#ff8c00', fg: 'black'}};
-                            
-                            return {{c: '#666', label: 'GREEN', bg: '#00ff00', fg: 'black'}};
+                        // Flag styles by track status code; unknown codes show as green
+                        const statusStyles = {{
+                            1: {{c: '#666', label: 'GREEN', bg: '#00ff00', fg: 'black'}},
+                            2: {{c: '#ffd700', label: 'YELLOW', bg: '#ffd700', fg: 'black'}},
+                            3: {{c: '#ffa500', label: 'SC', bg: '#ffa500', fg: 'black'}},
+                            4: {{c: '#ff0000', label: 'RED', bg: '#ff0000', fg: 'white'}},
+                            5: {{c: '#ff8c00', label: 'VSC', bg: '#ff8c00', fg: 'black'}},
+                            6: {{c: '#ff8c00', label: 'VSC', bg: '#ff8c00', fg: 'black'}},
+                            7: {{c: '#ff8c00', label: 'VSC', bg: '#ff8c00', fg: 'black'}}
+                        }};
+                        
+                        function getTrackColor(frame) {{
+                            return statusStyles[trackStatus[frame.idx]] || statusStyles[1];
                         }}
                         
-                        function getInterpolatedEntry(entries, t) {{
-                            let idx = -1;
-                            const step = data.time_steps[1] - data.time_steps[0];
-                            idx = Math.floor((t - data.time_steps[0]) / step);
-                            
+                        function entryAt(drv, i) {{
+                            if(isNaN(drv.x[i])) return null;
+                            return {{ x: drv.x[i], y: drv.y[i], d: drv.d[i] }};
+                        }}
+
+                        // Bracketing grid sample and blend weight for time t; the grid is shared, so this is
+                        // worked out once per draw rather than once per driver
+                        function frameAt(t) {{
+                            let idx = Math.floor((t - startTime) / timeStep);
+
                             if(idx < 0) idx = 0;
-                            if(idx >= data.time_steps.length - 1) idx = data.time_steps.length - 2;
-                            
+                            if(idx >= numSteps - 1) idx = numSteps - 2;
+
                             const t1 = data.time_steps[idx];
                             const t2 = data.time_steps[idx+1];
-                            const ratio = (t - t1) / (t2 - t1);
-                            
-                            const e1 = entries[idx];
-                            const e2 = entries[idx+1];
-                            
-                            if(!e1 || !e2) return e1 || e2; 
-                            
+                            return {{ idx: idx, ratio: (t - t1) / (t2 - t1) }};
+                        }}
+
+                        function getInterpolatedEntry(drv, frame) {{
+                            const idx = frame.idx;
+                            const ratio = frame.ratio;
+
+                            const e1 = entryAt(drv, idx);
+                            const e2 = entryAt(drv, idx+1);
+
+                            if(!e1 || !e2) return e1 || e2;
+
                             return {{
                                 x: e1.x + (e2.x - e1.x) * ratio,
                                 y: e1.y + (e2.y - e1.y) * ratio,
-                                d: e1.d + (e2.d - e1.d) * ratio,
-                                s: Math.round(e1.s + (e2.s - e1.s) * ratio),
-                                g: e1.g, 
-                                drs: e1.drs 
+                                d: e1.d + (e2.d - e1.d) * ratio
                             }};
                         }}
 
-                        function updateLapCounter(t) {{
-                            if(data.lap_data && data.lap_data.length > 0) {{
-                                let currentLap = 1;
-                                for(let i=0; i<data.lap_data.length; i++) {{
-                                    if(data.lap_data[i].t <= t) {{
-                                        currentLap = data.lap_data[i].l;
-                                    }} else {{
-                                        break;
-                                    }}
-                                }}
-                                lapDisplay.innerText = "LAP " + currentLap;
-                            }}
+                        function updateLapCounter(frame) {{
+                            const lap = lapByStep[frame.idx];
+                            if(lap > 0) setText(lapDisplay, "LAP " + lap);
                         }}
 
                         function draw() {{
@@ -1215,14 +1492,18 @@ def render_replay_tab(session):
                             ctx.fillStyle = "#000000";
                             ctx.fillRect(0, 0, canvas.width, canvas.height);
                             
-                            const statusInfo = getTrackColor(currentRaceTime);
+                            const frame = frameAt(currentRaceTime);
+                            const statusInfo = getTrackColor(frame);
                             
-                            flagStatus.innerText = statusInfo.label;
-                            flagStatus.style.backgroundColor = statusInfo.bg;
-                            flagStatus.style.color = statusInfo.fg;
-                            flagStatus.style.visibility = 'visible';
+                            if(statusInfo !== shownStatus) {{
+                                flagStatus.innerText = statusInfo.label;
+                                flagStatus.style.backgroundColor = statusInfo.bg;
+                                flagStatus.style.color = statusInfo.fg;
+                                flagStatus.style.visibility = 'visible';
+                                shownStatus = statusInfo;
+                            }}
                             
-                            updateLapCounter(currentRaceTime);
+                            updateLapCounter(frame);
                             
                             ctx.save();
                             
@@ -1231,47 +1512,40 @@ def render_replay_tab(session):
                             let focusX = 0, focusY = 0;
                             
                             // Get Focus Driver Position First
-                            if(data.drivers[data.focus_driver]) {{
-                                const fEntry = getInterpolatedEntry(data.drivers[data.focus_driver].entries, currentRaceTime);
+                            if(focusIdx >= 0) {{
+                                const fEntry = getInterpolatedEntry(drivers[focusIdx], frame);
                                 if(fEntry) {{
                                     focusX = fEntry.x;
                                     focusY = fEntry.y;
                                 }}
                             }}
 
+                            // 3. Draw Track
                             if (followCam && focusX !== 0) {{
                                 zoom = 3.5;
                                 ctx.translate(canvas.width/2, canvas.height/2);
                                 ctx.scale(zoom, zoom);
                                 ctx.translate(-focusX, -focusY);
+                                drawTrack(ctx, statusInfo.c, zoom);
                             }} else {{
-                                fitTrack();
+                                // The fitted view never moves, so reuse the pre-stroked layer until the
+                                // canvas size or flag colour changes
+                                const layerKey = canvas.width + 'x' + canvas.height + statusInfo.c;
+                                if(layerKey !== trackLayerKey) {{
+                                    trackLayer.width = canvas.width;
+                                    trackLayer.height = canvas.height;
+                                    fitTrack(trackCtx);
+                                    drawTrack(trackCtx, statusInfo.c, 1);
+                                    trackLayerKey = layerKey;
+                                }}
+                                ctx.drawImage(trackLayer, 0, 0);
+                                fitTrack(ctx);
                             }}
                             
-                            // 3. Draw Track
-                            ctx.lineJoin = "round";
-                            ctx.lineCap = "round";
-                            
-                            // Outer Line
-                            ctx.strokeStyle = statusInfo.c;
-                            ctx.lineWidth = 14 / zoom;
-                            ctx.beginPath();
-                            data.track.forEach((p, i) => {{ i===0 ? ctx.moveTo(p.x, p.y) : ctx.lineTo(p.x, p.y); }});
-                            ctx.stroke();
-                            
-                            // Inner Line
-                            ctx.strokeStyle = "#000000";
-                            ctx.lineWidth = 10 / zoom;
-                            ctx.beginPath();
-                            data.track.forEach((p, i) => {{ i===0 ? ctx.moveTo(p.x, p.y) : ctx.lineTo(p.x, p.y); }});
-                            ctx.stroke();
-                            
                             // 4. Draw Drivers
-                            const leaderboard = [];
-                            
-                            Object.keys(data.drivers).forEach(abbr => {{
-                                const drv = data.drivers[abbr];
-                                const entry = getInterpolatedEntry(drv.entries, currentRaceTime);
+                            drivers.forEach((drv, k) => {{
+                                const entry = getInterpolatedEntry(drv, frame);
+                                curDist[k] = entry ? entry.d : NaN;
                                 
                                 if(entry) {{
                                     ctx.fillStyle = drv.color;
@@ -1283,57 +1557,97 @@ def render_replay_tab(session):
                                     ctx.lineWidth = 4 / zoom;
                                     ctx.stroke();
                                     
-                                    leaderboard.push({{ abbr: abbr, dist: entry.d, color: drv.color }});
-                                    
-                                    if(abbr === data.focus_driver) {{
-                                        tSpeed.innerText = entry.s + " km/h";
-                                        tGear.innerText = entry.g;
-                                        tDrs.innerText = entry.drs ? "ON" : "OFF";
-                                        tDrs.style.color = entry.drs ? "#00ff00" : "#888";
-                                        tDist.innerText = (entry.d / 1000).toFixed(2) + " km";
+                                    if(k === focusIdx && focusTel.s) {{
+                                        const i = frame.idx;
+                                        const speed = Math.round(focusTel.s[i] + (focusTel.s[i+1] - focusTel.s[i]) * frame.ratio);
+                                        const drs = focusTel.drs[i];
+                                        setText(tSpeed, speed + " km/h");
+                                        setText(tGear, focusTel.g[i]);
+                                        if(setText(tDrs, drs ? "ON" : "OFF")) tDrs.style.color = drs ? "#00ff00" : "#888";
+                                        setText(tDist, (entry.d / 1000).toFixed(2) + " km");
                                     }}
                                 }}
                             }});
                             
                             ctx.restore();
                             
+                            // Leaderboard order is precomputed per time step; drop drivers with no position and
+                            // re-sort the (already nearly sorted) rows by the interpolated distances the gaps use,
+                            // so an overtake between grid steps never puts a car above one that is further on.
+                            // Only then cut to the shown rows, so a dropped car never leaves the board short.
+                            const frameIdx = Math.min(data.time_steps.length - 1, Math.max(0, Math.round((currentRaceTime - startTime) / timeStep)));
+                            const leaderboard = order.subarray(frameIdx * orderWidth, (frameIdx + 1) * orderWidth)
+                                .filter(k => !isNaN(curDist[k]))
+                                .sort((a, b) => curDist[b] - curDist[a])
+                                .slice(0, leaderboardSize);
+                            
                             // 5. Update UI
                             const mins = Math.floor(currentRaceTime / 60).toString().padStart(2, '0');
                             const secs = (currentRaceTime % 60).toFixed(1).padStart(4, '0');
-                            timeDisplay.innerText = `TIME: ${{mins}}:${{secs}}`;
+                            setText(timeDisplay, `TIME: ${{mins}}:${{secs}}`);
                             
                             updateLeaderboard(leaderboard);
                         }}
                         
-                        function fitTrack() {{
+                        function drawTrack(c, color, zoom) {{
+                            c.lineJoin = "round";
+                            c.lineCap = "round";
+                            
+                            // Outer Line
+                            c.strokeStyle = color;
+                            c.lineWidth = 14 / zoom;
+                            c.stroke(trackPath);
+                            
+                            // Inner Line
+                            c.strokeStyle = "#000000";
+                            c.lineWidth = 10 / zoom;
+                            c.stroke(trackPath);
+                        }}
+                        
+                        function fitTrack(c) {{
                             const padding = 40;
                             const scaleX = (canvas.width - padding*2) / trackWidth;
                             const scaleY = (canvas.height - padding*2) / trackHeight;
                             const scale = Math.min(scaleX, scaleY);
                             const offsetX = (canvas.width - trackWidth * scale) / 2 - minX * scale;
                             const offsetY = (canvas.height - trackHeight * scale) / 2 - minY * scale;
-                            ctx.setTransform(scale, 0, 0, scale, offsetX, offsetY);
+                            c.setTransform(scale, 0, 0, scale, offsetX, offsetY);
+                        }}
+                        
+                        // Leaderboard rows are created once; each frame only rewrites their text
+                        const lbRows = [];
+                        for(let i=0; i<leaderboardSize; i++) {{
+                            const row = document.createElement('div');
+                            row.className = 'lb-row';
+                            const pos = document.createElement('span');
+                            pos.className = 'lb-pos';
+                            pos.textContent = i + 1;
+                            const name = document.createElement('span');
+                            name.className = 'lb-name';
+                            const gap = document.createElement('span');
+                            gap.className = 'lb-gap';
+                            row.appendChild(pos);
+                            row.appendChild(name);
+                            row.appendChild(gap);
+                            lbContent.appendChild(row);
+                            lbRows.push({{ row: row, name: name, gap: gap }});
                         }}
                         
                         function updateLeaderboard(list) {{
-                            list.sort((a,b) => b.dist - a.dist);
-                            let html = "";
-                            if(list.length > 0) {{
-                                const leaderDist = list[0].dist;
-                                list.slice(0, 15).forEach((d, i) => {{
-                                    let gap = (leaderDist - d.dist) / 200.0;
-                                    let gapStr = gap > 0 ? "+" + gap.toFixed(1) + "s" : "LEADER";
-                                    const isFocus = d.abbr === data.focus_driver;
-                                    html += `
-                                        <div class="lb-row ${{isFocus ? 'focus' : ''}}">
-                                            <span class="lb-pos">${{i+1}}</span>
-                                            <span class="lb-name" style="color: ${{d.color}}">${{d.abbr}}</span>
-                                            <span class="lb-gap">${{gapStr}}</span>
-                                        </div>
-                                    `;
-                                }});
-                            }}
-                            lbContent.innerHTML = html;
+                            // list holds driver indices, leader first
+                            const leaderDist = list.length > 0 ? curDist[list[0]] : 0;
+                            lbRows.forEach((r, i) => {{
+                                if(i >= list.length) {{
+                                    r.row.style.display = 'none';
+                                    return;
+                                }}
+                                const k = list[i];
+                                const gap = (leaderDist - curDist[k]) / 200.0;
+                                r.row.style.display = '';
+                                r.row.classList.toggle('focus', k === focusIdx);
+                                if(setText(r.name, driverAbbrs[k])) r.name.style.color = driverColors[k];
+                                setText(r.gap, gap > 0 ? "+" + gap.toFixed(1) + "s" : "LEADER");
+                            }});
                         }}
                         
                         resize();
@@ -1343,14 +1657,16 @@ def render_replay_tab(session):
                 </html>
                 """
                 
-                components.html(html_code, height=760)
-                status_text.empty()
-                progress_bar.empty()
+                st.session_state['replay_html'] = (replay_key, html_code)
 
         except Exception as e:
             st.error(f"An error occurred: {e}")
             st.exception(e)
 
+    replay_html = st.session_state.get('replay_html')
+    if replay_html is not None and replay_html[0] == replay_key:
+        components.html(replay_html[1], height=760)
+
 # --- Helper for Lazy Loading ---
 def ensure_full_data_loaded(session):
     if st.session_state.get('data_mode') == 'light':
@@ -1360,18 +1676,33 @@ def ensure_full_data_loaded(session):
             st.session_state['session'] = session # Update session in state
             st.rerun()
 
-@st.cache_data
+MARQUEE_CACHE_TTL = 3600 # seconds
+MARQUEE_DRIVER_COLS = ['position', 'familyName', 'points']
+MARQUEE_CONSTRUCTOR_COLS = ['position', 'constructorName', 'points']
+
+@st.cache_data(ttl=MARQUEE_CACHE_TTL, show_spinner=False)
 def fetch_marquee_data(year):
+    # Parquet copies survive server restarts, so only the first visitor per hour waits on Ergast
+    d_file = f"marquee_{year}_drivers.parquet"
+    c_file = f"marquee_{year}_constructors.parquet"
+    drivers = read_parquet_cache(d_file, MARQUEE_CACHE_TTL, columns=MARQUEE_DRIVER_COLS)
+    constructors = read_parquet_cache(c_file, MARQUEE_CACHE_TTL, columns=MARQUEE_CONSTRUCTOR_COLS)
+    if drivers is not None and constructors is not None:
+        return drivers, constructors
+
     try:
         ergast = Ergast()
         # Top 5 Drivers
         d_resp = ergast.get_driver_standings(season=year, limit=5)
-        drivers = d_resp.content[0] if d_resp.content else pd.DataFrame()
+        drivers = d_resp.content[0][MARQUEE_DRIVER_COLS] if d_resp.content else pd.DataFrame()
         
         # Top 3 Constructors
         c_resp = ergast.get_constructor_standings(season=year, limit=3)
-        constructors = c_resp.content[0] if c_resp.content else pd.DataFrame()
+        constructors = c_resp.content[0][MARQUEE_CONSTRUCTOR_COLS] if c_resp.content else pd.DataFrame()
         
+        if not drivers.empty and not constructors.empty:
+            write_parquet_cache(drivers, d_file)
+            write_parquet_cache(constructors, c_file)
         return drivers, constructors
     except:
         return pd.DataFrame(), pd.DataFrame()